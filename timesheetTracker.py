@@ -1,6 +1,8 @@
 # Required pip installs:
 # pip install PyQt6
 # pip install pyinstaller
+# Optional (faster open/save):
+# pip install orjson
 
 # Usage: 
 #   python timesheetTracker.py
@@ -8,47 +10,69 @@
 #   pyinstaller --onefile --windowed timesheetTracker.py
 
 import sys
+import math
+import time as _time
+from contextlib import contextmanager, suppress
 from datetime import datetime, timedelta
 import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                             QTreeWidget, QTreeWidgetItem, QMessageBox, 
                             QFileDialog, QMenuBar, QMenu, QStyledItemDelegate, 
-                            QStyleOptionViewItem, QCheckBox)
-from PyQt6.QtCore import Qt, QModelIndex
+                            QHeaderView, QCheckBox)
+from PyQt6.QtCore import Qt, QModelIndex, QSignalBlocker
 from PyQt6.QtGui import QPalette, QColor, QFont
 import os
 
+# Dark theme palette colors, as RGB tuples or Qt global colors
+_DARK_COLORS = (
+    (QPalette.ColorRole.Window, (53, 53, 53)),
+    (QPalette.ColorRole.WindowText, Qt.GlobalColor.white),
+    (QPalette.ColorRole.Base, (35, 35, 35)),
+    (QPalette.ColorRole.AlternateBase, (53, 53, 53)),
+    (QPalette.ColorRole.ToolTipBase, (25, 25, 25)),
+    (QPalette.ColorRole.ToolTipText, Qt.GlobalColor.white),
+    (QPalette.ColorRole.Text, Qt.GlobalColor.white),
+    (QPalette.ColorRole.Button, (53, 53, 53)),
+    (QPalette.ColorRole.ButtonText, Qt.GlobalColor.white),
+    (QPalette.ColorRole.BrightText, Qt.GlobalColor.red),
+    (QPalette.ColorRole.Link, (42, 130, 218)),
+    (QPalette.ColorRole.Highlight, (42, 130, 218)),
+    (QPalette.ColorRole.HighlightedText, (35, 35, 35)),
+)
+
 class CustomDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font = QFont("Arial", 12)
+
     def sizeHint(self, option, index):
         size = super().sizeHint(option, index)
-        if index.column() == 3:  # Description column
-            text = index.data()
-            metrics = option.fontMetrics
-            width = self.tree.columnWidth(3)  # Get the actual column width
-            
-            # Calculate height with a smaller width to force earlier wrapping
-            effective_width = width * 0.75  # Use slightly smaller width to encourage wrapping
-            
-            # Calculate required height with word wrap
-            height = metrics.boundingRect(0, 0, int(effective_width), 0, 
-                                        Qt.TextFlag.TextWordWrap | Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
-                                        text).height()
-            
-            # Set minimum height and add padding
-            min_height = 30  # Minimum height for consistency
-            size.setHeight(max(height + 12, min_height))
+        min_height = 30  # Minimum height for consistency
+        size.setHeight(max(size.height(), min_height))
         return size
 
     def initStyleOption(self, option, index):
         super().initStyleOption(option, index)
-        option.font = QFont("Arial", 12)
-        if index.column() == 3:  # Description column
+        option.font = self.font
+        if index.column() == 3:  # Description column, full text is shown in the tooltip
             option.displayAlignment = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
-            option.textElideMode = Qt.TextElideMode.ElideNone
-            option.features |= QStyleOptionViewItem.ViewItemFeature.WrapText
+            option.textElideMode = Qt.TextElideMode.ElideRight
+
+class EntryItem(QTreeWidgetItem):
+    def __lt__(self, other):
+        column = self.treeWidget().sortColumn()
+        if column == 0:  # Hours column, compare the stored numbers rather than the text
+            return self.data(0, Qt.ItemDataRole.UserRole) < other.data(0, Qt.ItemDataRole.UserRole)
+        return self.text(column) < other.text(column)
 
 class TimesheetTracker(QMainWindow):
+    _START_TIME = datetime(1900, 1, 1, 8, 0, 0)  # Workday starts at 8:00 AM
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Timesheet Tracker")
@@ -63,10 +87,15 @@ class TimesheetTracker(QMainWindow):
         )
         
         self.current_file = None
-        self.total_time = 0.0
-        self.billable_time = 0.0
-        self.expected_time_offset = 0.0  # Track lunch and other non-counted time
-        self.project_groups = {}  # Track time by project first letter
+        # Hours are tracked as integer tenths of an hour so repeated adds don't drift
+        self._total_tenths = 0
+        self._billable_tenths = 0
+        self._expected_offset_tenths = 0  # Track lunch and other non-counted time
+        self.project_groups = {}  # Track tenths by project first letter
+        self._groups_text_cache = ""  # Rendered project groups for the total label
+        self._groups_dirty = False  # Set whenever project_groups changes
+        self._last_total_str = None  # Last text shown in the status labels
+        self._last_expected_str = None
         
         # Create central widget and main layout
         central_widget = QWidget()
@@ -128,6 +157,11 @@ class TimesheetTracker(QMainWindow):
         self.tree.setColumnWidth(2, 100)
         self.tree.setColumnWidth(3, 450)
         self.tree.setColumnWidth(4, 80)
+        for i in range(5):
+            self.tree.header().setSectionResizeMode(i, QHeaderView.ResizeMode.Fixed)
+        
+        # All rows share one height so Qt doesn't have to measure each of them
+        self.tree.setUniformRowHeights(True)
                 
         # Enable sorting
         self.tree.setSortingEnabled(True)
@@ -138,12 +172,8 @@ class TimesheetTracker(QMainWindow):
 
         # Set custom delegate for larger text in cells
         delegate = CustomDelegate()
-        delegate.tree = self.tree  # Give delegate access to tree widget
         self.tree.setItemDelegate(delegate)
         
-        # Enable word wrap
-        self.tree.setWordWrap(True)
-        
         # Disable full row selection
         self.tree.setSelectionBehavior(QTreeWidget.SelectionBehavior.SelectItems)
         
@@ -201,6 +231,22 @@ class TimesheetTracker(QMainWindow):
         exit_action = file_menu.addAction("Exit")
         exit_action.triggered.connect(self.close)
 
+    @contextmanager
+    def _frozen(self, bulk=False):
+        # Hold off repaints while the tree is changed; bulk changes also pause sorting
+        # and signals so the rows are sorted once when the block ends
+        if bulk:
+            self.tree.setSortingEnabled(False)
+            self.tree.blockSignals(True)
+        self.tree.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.tree.setUpdatesEnabled(True)
+            if bulk:
+                self.tree.blockSignals(False)
+                self.tree.setSortingEnabled(True)
+
     def new_timesheet(self):
         if self.tree.topLevelItemCount() > 0:
             reply = QMessageBox.question(self, "Confirm", 
@@ -209,11 +255,13 @@ class TimesheetTracker(QMainWindow):
             if reply == QMessageBox.StandardButton.No:
                 return
                 
-        self.tree.clear()
-        self.total_time = 0.0
-        self.billable_time = 0.0
-        self.expected_time_offset = 0.0
+        with self._frozen():
+            self.tree.clear()
+        self._total_tenths = 0
+        self._billable_tenths = 0
+        self._expected_offset_tenths = 0
         self.project_groups = {}
+        self._groups_dirty = True
         self.update_total()
         self.current_file = None
 
@@ -231,34 +279,55 @@ class TimesheetTracker(QMainWindow):
         
         if filename:
             try:
-                with open(filename, 'r') as f:
-                    data = json.load(f)
-                self.tree.clear()
-                self.total_time = 0.0
-                self.billable_time = 0.0
-                self.expected_time_offset = 0.0
-                self.current_file = filename
+                with open(filename, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if orjson else json.loads(raw)
                 
-                for entry in data['entries']:
-                    billable_text = "X" if entry.get('billable', True) else ""
-                    item = QTreeWidgetItem([
-                        str(entry['time']),
-                        billable_text,
-                        entry['project'],
-                        entry['description'],
-                        entry['timestamp']
-                    ])
-                    self.tree.addTopLevelItem(item)
-                    
-                    # Special handling for "Lunch" project
-                    if entry['project'].lower() == "lunch":
-                        self.expected_time_offset += float(entry['time'])
-                    else:
-                        self.total_time += float(entry['time'])
-                        if entry.get('billable', True):
-                            self.billable_time += float(entry['time'])
+                # Parse every entry before touching any state so a bad file leaves the current timesheet alone
+                rows = []
+                adjusted = []  # Entries saved before 0.1-hour increments were enforced
+                for number, entry in enumerate(data['entries'], start=1):
+                    tenths, exact = self.parse_tenths(entry['time'])
+                    if not exact:
+                        adjusted.append(f"Entry {number} ({entry['project']}: {entry['description']}): "
+                                        f"{float(entry['time'])} -> {tenths / 10} hours")
+                    rows.append((tenths,
+                                 entry.get('billable', True),
+                                 entry['project'],
+                                 entry['description'],
+                                 entry['timestamp'],
+                                 entry['project'].lower() == "lunch"))
+                
+                items = []
+                for tenths, billable, project, description, timestamp, is_lunch in rows:
+                    item = EntryItem([str(tenths / 10), "X" if billable else "", project, description, timestamp])
+                    item.setToolTip(3, description)
+                    self.store_entry_data(item, tenths, billable, is_lunch)
+                    items.append(item)
+                
+                # Freeze the tree so the rows are sorted and laid out once
+                with self._frozen(bulk=True):
+                    self.tree.clear()
+                    self.tree.addTopLevelItems(items)
+                
+                # Special handling for "Lunch" project
+                worked = [row for row in rows if not row[5]]
+                self._expected_offset_tenths = sum(row[0] for row in rows if row[5])
+                self._total_tenths = sum(row[0] for row in worked)
+                self._billable_tenths = sum(row[0] for row in worked if row[1])
+                self.project_groups = {}
+                for tenths, billable, project, _, _, _ in worked:
+                    if billable:
+                        self.adjust_project_group(project, tenths)
+                self._groups_dirty = True
+                self.current_file = filename
                 
                 self.update_total()
+                
+                if adjusted:
+                    QMessageBox.warning(self, "Warning",
+                        "Some entries were not in increments of 0.1 hours and have been rounded "
+                        "to the nearest tenth. Saving will keep the rounded values.\n\n" + "\n".join(adjusted))
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load file: {str(e)}")
 
@@ -282,25 +351,34 @@ class TimesheetTracker(QMainWindow):
         for i in range(self.tree.topLevelItemCount()):
             item = self.tree.topLevelItem(i)
             entries.append({
-                'time': float(item.text(0)),
+                'time': item.data(0, Qt.ItemDataRole.UserRole) / 10,
                 'project': item.text(2),
                 'description': item.text(3),
                 'timestamp': item.text(4),
-                'billable': item.text(1) == "X"
+                'billable': item.data(1, Qt.ItemDataRole.UserRole)
             })
         
         data = {
             'entries': entries,
-            'total_time': self.total_time,
-            'billable_time': self.billable_time,
-            'expected_time_offset': self.expected_time_offset
+            'total_time': self._total_tenths / 10,
+            'billable_time': self._billable_tenths / 10,
+            'expected_time_offset': self._expected_offset_tenths / 10
         }
         
+        # Write to a temporary file first so a failed save can't truncate the timesheet
+        tmp_filename = filename + '.tmp'
         try:
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=4)
+            if orjson:
+                with open(tmp_filename, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_filename, 'w') as f:
+                    json.dump(data, f, indent=2)
+            os.replace(tmp_filename, filename)
             QMessageBox.information(self, "Success", "Timesheet saved successfully!")
         except Exception as e:
+            with suppress(OSError):
+                os.remove(tmp_filename)
             QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
 
     def edit_entry(self):
@@ -309,23 +387,30 @@ class TimesheetTracker(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select an entry to edit")
             return
         
-        time = float(current_item.text(0))
+        tenths = current_item.data(0, Qt.ItemDataRole.UserRole)
         project = current_item.text(2)
+        billable = current_item.data(1, Qt.ItemDataRole.UserRole)
         
         # Remove time from appropriate counter
-        if project.lower() == "lunch":
-            self.expected_time_offset -= time
+        if current_item.data(2, Qt.ItemDataRole.UserRole):  # Lunch entry
+            self._expected_offset_tenths -= tenths
         else:
-            self.total_time -= time
-            if current_item.text(1) == "X":
-                self.billable_time -= time
+            self._total_tenths -= tenths
+            if billable:
+                self._billable_tenths -= tenths
+                self.adjust_project_group(project, -tenths)
             
-        self.time_input.setText(current_item.text(0))
-        self.project_input.setText(current_item.text(2))
-        self.desc_input.setText(current_item.text(3))
-        self.billable_checkbox.setChecked(current_item.text(1) == "X")
-        
-        self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(current_item))
+        # Fill the inputs in one repaint, without emitting the checkbox's signals
+        self.centralWidget().setUpdatesEnabled(False)
+        with QSignalBlocker(self.billable_checkbox):
+            self.time_input.setText(current_item.text(0))
+            self.project_input.setText(current_item.text(2))
+            self.desc_input.setText(current_item.text(3))
+            self.billable_checkbox.setChecked(billable)
+        self.centralWidget().setUpdatesEnabled(True)
+        
+        with self._frozen():
+            self.tree.invisibleRootItem().removeChild(current_item)
         self.update_total()
 
     def delete_entry(self):
@@ -339,74 +424,79 @@ class TimesheetTracker(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
             
         if reply == QMessageBox.StandardButton.Yes:
-            time = float(current_item.text(0))
+            tenths = current_item.data(0, Qt.ItemDataRole.UserRole)
             project = current_item.text(2)
             
             # Remove time from appropriate counter
-            if project.lower() == "lunch":
-                self.expected_time_offset -= time
+            if current_item.data(2, Qt.ItemDataRole.UserRole):  # Lunch entry
+                self._expected_offset_tenths -= tenths
             else:
-                self.total_time -= time
-                if current_item.text(1) == "X":
-                    self.billable_time -= time
+                self._total_tenths -= tenths
+                if current_item.data(1, Qt.ItemDataRole.UserRole):
+                    self._billable_tenths -= tenths
+                    self.adjust_project_group(project, -tenths)
                     
-            self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(current_item))
+            with self._frozen():
+                self.tree.invisibleRootItem().removeChild(current_item)
             self.update_total()
 
     def update_total(self):
-        # Update project groups first so we can include them in the total label
-        self.update_project_groups()
-        
-        # Format project groups text for inclusion in total label
-        project_groups_text = ""
-        if self.project_groups:
-            sorted_groups = sorted(self.project_groups.items())
-            project_groups_text = f" [{', '.join([f'{letter}: {hours:.1f}h' for letter, hours in sorted_groups])}]"
-        
-        # Update total label with project groups included
-        self.total_label.setText(f"Total Time: {self.total_time:.1f} hours (Billable: {self.billable_time:.1f} hours){project_groups_text}")
-        
-        # Calculate expected time (8:00 AM + total hours + expected_time_offset)
-        start_time = datetime.strptime("8:00 AM", "%I:%M %p")
-        total_expected_hours = self.total_time + self.expected_time_offset
-        hours = int(total_expected_hours)
-        minutes = int((total_expected_hours - hours) * 60)
-        expected_time = start_time + timedelta(hours=hours, minutes=minutes)
+        # Format project groups text for inclusion in total label, only when they changed
+        if self._groups_dirty:
+            self._groups_text_cache = ""
+            if self.project_groups:
+                sorted_groups = sorted(self.project_groups.items())
+                self._groups_text_cache = f" [{', '.join(f'{letter}: {tenths / 10:.1f}h' for letter, tenths in sorted_groups)}]"
+            self._groups_dirty = False
+        project_groups_text = self._groups_text_cache
+        
+        # Update total label with project groups included, skipping the repaint if nothing changed
+        total_str = f"Total Time: {self._total_tenths / 10:.1f} hours (Billable: {self._billable_tenths / 10:.1f} hours){project_groups_text}"
+        if total_str != self._last_total_str:
+            self.total_label.setText(total_str)
+            self._last_total_str = total_str
+        
+        # Calculate expected time (8:00 AM + total hours + lunch offset), a tenth of an hour is 360 seconds
+        start_time = self._START_TIME
+        total_expected_tenths = self._total_tenths + self._expected_offset_tenths
+        expected_time = start_time + timedelta(seconds=total_expected_tenths * 360)
         expected_time_str = expected_time.strftime("%I:%M %p")
         
-        self.expected_time_label.setText(f"Expected Time: {expected_time_str}")
+        expected_str = f"Expected Time: {expected_time_str}"
+        if expected_str != self._last_expected_str:
+            self.expected_time_label.setText(expected_str)
+            self._last_expected_str = expected_str
     
-    def update_project_groups(self):
-        # Reset project groups
-        self.project_groups = {}
-        
-        # Iterate through all entries
-        for i in range(self.tree.topLevelItemCount()):
-            item = self.tree.topLevelItem(i)
-            time = float(item.text(0))
-            project = item.text(2)
-            billable = item.text(1) == "X"
-            
-            # Skip lunch entries and non-billable entries
-            if project.lower() == "lunch" or not billable:
-                continue
-                
-            # Get first letter of project (or use "?" if empty)
-            first_letter = project[0].upper() if project else "?"
-            
-            # Add time to the appropriate group
-            if first_letter in self.project_groups:
-                self.project_groups[first_letter] += time
-            else:
-                self.project_groups[first_letter] = time
-                
-        # Clear the project_groups_label as we're now showing this info in the total_label
-        self.project_groups_label.setText("")
+    def parse_tenths(self, value):
+        # Convert hours to whole tenths, rounding halves up, and report whether the value
+        # was already a multiple of 0.1
+        time = float(value)
+        tenths = math.floor(time * 10 + 0.5)
+        return tenths, abs(tenths / 10 - time) <= 1e-9
+
+    def store_entry_data(self, item, tenths, billable, is_lunch):
+        # Keep native values on the item so they don't have to be parsed back from text,
+        # hours are stored as an integer count of tenths so they add up exactly
+        item.setData(0, Qt.ItemDataRole.UserRole, int(tenths))
+        item.setData(1, Qt.ItemDataRole.UserRole, bool(billable))
+        item.setData(2, Qt.ItemDataRole.UserRole, bool(is_lunch))
+
+    def adjust_project_group(self, project, delta):
+        # Get first letter of project (or use "?" if empty)
+        first_letter = project[0].upper() if project else "?"
+        
+        # Apply the change in tenths to the appropriate group, dropping groups that reach zero
+        tenths = self.project_groups.get(first_letter, 0) + delta
+        if tenths == 0:
+            self.project_groups.pop(first_letter, None)
+        else:
+            self.project_groups[first_letter] = tenths
+        self._groups_dirty = True
             
     def add_entry(self):
         try:
-            time = float(self.time_input.text())
-            if not round(time * 10) % 1 == 0:
+            tenths, exact = self.parse_tenths(self.time_input.text().strip())
+            if not exact:
                 raise ValueError("Time must be in increments of 0.1 hours")
             
             project = self.project_input.text()
@@ -414,26 +504,26 @@ class TimesheetTracker(QMainWindow):
                 project = "kdg"
                 
             description = self.desc_input.text()
-            timestamp = datetime.now().strftime("%I:%M:%S %p")
+            timestamp = _time.strftime("%I:%M:%S %p")
             
+            is_lunch = project.lower() == "lunch"
             billable = "X" if self.billable_checkbox.isChecked() else ""
-            item = QTreeWidgetItem([str(time), billable, project, description, timestamp])
+            item = EntryItem([str(tenths / 10), billable, project, description, timestamp])
+            item.setToolTip(3, description)
+            self.store_entry_data(item, tenths, self.billable_checkbox.isChecked(), is_lunch)
             # Make all columns sortable by setting text alignment
             for i in range(5):
                 item.setTextAlignment(i, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
             self.tree.addTopLevelItem(item)
             
-            # Force the tree to recalculate row heights
-            row = self.tree.indexOfTopLevelItem(item)
-            self.tree.updateGeometries()
-            
             # Special handling for "Lunch" project
-            if project.lower() == "lunch":
-                self.expected_time_offset += time
+            if is_lunch:
+                self._expected_offset_tenths += tenths
             else:
-                self.total_time += time
+                self._total_tenths += tenths
                 if self.billable_checkbox.isChecked():
-                    self.billable_time += time
+                    self._billable_tenths += tenths
+                    self.adjust_project_group(project, tenths)
             
             self.update_total()
             
@@ -453,19 +543,8 @@ def main():
     
     # Set up the dark theme palette
     palette = QPalette()
-    palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.Base, QColor(35, 35, 35))
-    palette.setColor(QPalette.ColorRole.AlternateBase, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(25, 25, 25))
-    palette.setColor(QPalette.ColorRole.ToolTipText, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.Button, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red)
-    palette.setColor(QPalette.ColorRole.Link, QColor(42, 130, 218))
-    palette.setColor(QPalette.ColorRole.Highlight, QColor(42, 130, 218))
-    palette.setColor(QPalette.ColorRole.HighlightedText, QColor(35, 35, 35))
+    for role, color in _DARK_COLORS:
+        palette.setColor(role, QColor(*color) if isinstance(color, tuple) else color)
     
     # Apply the palette
     app.setPalette(palette)